@@ -0,0 +1,104 @@
+import asyncio
+import logging
+import functools
+from azure.core.exceptions import AzureError
+
+logger = logging.getLogger(__name__)
+
+# Seconds between run status checks: start short so quick runs return promptly,
+# then back off to the SDK's usual one-second interval
+RUN_POLL_INITIAL_INTERVAL = 0.25
+RUN_POLL_MAX_INTERVAL = 1.0
+
+# Seconds allowed for cleanup calls such as cancelling a timed-out run
+CLEANUP_TIMEOUT_SECS = 10
+
+class RunFailedError(Exception):
+    """
+    An agent run finished without producing an answer (failed, cancelled, expired, ...).
+    """
+    def __init__(self, message: str, code: str = None):
+        super().__init__(message)
+        self.code = code
+
+class TransientRunError(RunFailedError):
+    """
+    A run failed for a reason worth retrying, such as model rate limiting inside the run.
+    """
+
+# Run statuses that mean the run is still using quota on the server
+ACTIVE_RUN_STATUSES = {"queued", "in_progress", "requires_action"}
+
+# Run error codes that mean "try again later" rather than "this request is broken"
+TRANSIENT_RUN_ERROR_CODES = {"rate_limit_exceeded", "server_error"}
+
+async def run_blocking(func, *args, **kwargs):
+    """
+    Run a blocking Azure SDK call in the default executor so the event loop stays free.
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(None, functools.partial(func, *args, **kwargs))
+
+async def cancel_run(agents, thread_id: str, run_id: str):
+    """
+    Cancel a run on the server to free its quota, without letting cleanup hang.
+    """
+    try:
+        await asyncio.wait_for(
+            run_blocking(agents.cancel_run, thread_id=thread_id, run_id=run_id),
+            timeout=CLEANUP_TIMEOUT_SECS
+        )
+    except (AzureError, asyncio.TimeoutError):
+        logger.exception("Failed to cancel run %s", run_id)
+
+async def delete_thread(agents, thread_id: str):
+    """
+    Delete a finished thread on the server, without letting cleanup hang or raise.
+    """
+    try:
+        await asyncio.wait_for(
+            run_blocking(agents.delete_thread, thread_id=thread_id),
+            timeout=CLEANUP_TIMEOUT_SECS
+        )
+    except (AzureError, asyncio.TimeoutError):
+        logger.exception("Failed to delete thread %s", thread_id)
+
+async def process_run(agents, thread_id: str, agent_id: str):
+    """
+    Start a run with `agents` (an AIProjectClient's agents operations) and poll it
+    until it finishes, yielding to the event loop between checks.
+    If the wait ends early for any reason (a timeout, a failed status check, ...), the
+    run is cancelled on the server too.
+    Raises RunFailedError if the run does not complete, or TransientRunError if it
+    failed because of rate limiting or a server error.
+    """
+    run = None
+    create = asyncio.ensure_future(run_blocking(agents.create_run, thread_id=thread_id, agent_id=agent_id))
+    try:
+        run = await asyncio.shield(create)
+        interval = RUN_POLL_INITIAL_INTERVAL
+        while run.status in ("queued", "in_progress"):
+            await asyncio.sleep(interval)
+            interval = min(interval * 2, RUN_POLL_MAX_INTERVAL)
+            run = await run_blocking(agents.get_run, thread_id=thread_id, run_id=run.id)
+    except BaseException:
+        # Whatever stopped the wait (a timeout, a failed poll, ...), don't leave the run
+        # going on the server: a retry would start another one alongside it
+        if run is None and not create.done():
+            # create_run keeps going in its executor thread; wait briefly for the run id
+            # so the run it creates can still be cancelled
+            try:
+                run = await asyncio.wait_for(asyncio.shield(create), timeout=CLEANUP_TIMEOUT_SECS)
+            except (AzureError, asyncio.TimeoutError):
+                logger.exception("Run creation did not finish after the wait was abandoned")
+        elif run is None and not create.cancelled() and create.exception() is None:
+            # create_run finished just as the wait was abandoned
+            run = create.result()
+        if run is not None and run.status in ACTIVE_RUN_STATUSES:
+            await cancel_run(agents, thread_id, run.id)
+        raise
+    if run.status != "completed":
+        code = run.last_error.code if run.last_error else None
+        error_class = TransientRunError if code in TRANSIENT_RUN_ERROR_CODES else RunFailedError
+        raise error_class(f"Run {run.id} ended with status {run.status}: {run.last_error}", code=code)
+    return run
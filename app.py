@@ -1,135 +1,390 @@
-import os
+import atexit
 import asyncio
+import hashlib
+import logging
+import contextlib
+import requests
+from dataclasses import dataclass
+from requests.adapters import HTTPAdapter
 from dotenv import load_dotenv
 from autogen_agentchat.agents import AssistantAgent
 from autogen_agentchat.conditions import MaxMessageTermination, TextMentionTermination
 from autogen_agentchat.teams import RoundRobinGroupChat
 from autogen_agentchat.ui import Console
 from autogen_ext.models.openai import AzureOpenAIChatCompletionClient
+from azure.core.exceptions import AzureError, HttpResponseError, ServiceRequestError, ServiceResponseError
+from azure.core.pipeline.transport import RequestsTransport
 from azure.identity import DefaultAzureCredential
 from azure.ai.projects import AIProjectClient
-from azure.ai.projects.models import BingGroundingTool
+from azure.ai.projects.models import Agent, BingGroundingTool
+from agent_runs import RunFailedError, TransientRunError, delete_thread, process_run, run_blocking
+from config import AppConfig
+from research_parser import collapse_repeated, parse_sections
+from resilience import CircuitBreaker, CircuitOpenError, retry_transient
+from ttl_cache import TTLCache
 
 ###############################################################################
 #                               ENVIRONMENT SETUP
 ###############################################################################
 load_dotenv()
 
-# Load environment variables
-API_KEY = os.getenv("api_key")
-PROJECT_CONNECTION_STRING = os.getenv("PROJECT_CONNECTION_STRING")
-BING_CONNECTION_NAME = os.getenv("BING_CONNECTION_NAME")
-MODEL_DEPLOYMENT_NAME = os.getenv("MODEL_DEPLOYMENT_NAME")
-MODEL_API_VERSION = os.getenv("MODEL_API_VERSION")
-AZURE_ENDPOINT = os.getenv("AZURE_ENDPOINT")
+logger = logging.getLogger(__name__)
 
-# Validate required environment variables
-if not all([API_KEY, PROJECT_CONNECTION_STRING, BING_CONNECTION_NAME, MODEL_DEPLOYMENT_NAME, MODEL_API_VERSION, AZURE_ENDPOINT]):
-    raise ValueError("Missing one or more required environment variables.")
+CONFIG = AppConfig.from_env()
 
 ###############################################################################
 #                               CLIENT INITIALIZATION
 ###############################################################################
 # Azure OpenAI Client
 az_model_client = AzureOpenAIChatCompletionClient(
-    azure_deployment=MODEL_DEPLOYMENT_NAME,
-    model=MODEL_DEPLOYMENT_NAME,
-    api_version=MODEL_API_VERSION,
-    azure_endpoint=AZURE_ENDPOINT,
-    api_key=API_KEY
+    azure_deployment=CONFIG.model_deployment_name,
+    model=CONFIG.model_deployment_name,
+    api_version=CONFIG.model_api_version,
+    azure_endpoint=CONFIG.azure_endpoint,
+    api_key=CONFIG.api_key
 )
 
+# Shared HTTP session so concurrent Azure SDK calls reuse warm TLS connections
+# instead of opening (and discarding) one per request
+http_session = requests.Session()
+http_adapter = HTTPAdapter(pool_connections=10, pool_maxsize=32)
+http_session.mount("https://", http_adapter)
+http_session.mount("http://", http_adapter)
+atexit.register(http_session.close)
+
 # AI Project Client
 project_client = AIProjectClient.from_connection_string(
     credential=DefaultAzureCredential(),
-    conn_str=PROJECT_CONNECTION_STRING,
+    conn_str=CONFIG.project_connection_string,
+    transport=RequestsTransport(session=http_session, session_owner=False),
 )
 
 # Retrieve Bing connection
-bing_connection = project_client.connections.get(connection_name=BING_CONNECTION_NAME)
+bing_connection = project_client.connections.get(connection_name=CONFIG.bing_connection_name)
 conn_id = bing_connection.id
+bing = BingGroundingTool(connection_id=conn_id)
 
 ###############################################################################
 #                               HELPER FUNCTIONS
 ###############################################################################
-async def execute_tool(stock_name: str, agent_name: str, instructions: str) -> str:
+# Long-lived Azure agents, one per tool name, created on first use
+_AGENT_POOL: dict[str, Agent] = {}
+_AGENT_POOL_LOCK = asyncio.Lock()
+
+async def get_pooled_agent(agent_name: str, instructions: str) -> Agent:
     """
-    Generic function to execute a tool using BingGroundingTool and Azure AI.
+    Return the pooled agent for a tool, creating it on the first call.
     """
-    print(f"[{agent_name}] Executing tool for {stock_name}...")
-    bing = BingGroundingTool(connection_id=conn_id)
-    agent = project_client.agents.create_agent(
-        model=MODEL_DEPLOYMENT_NAME,
-        name=agent_name,
-        instructions=instructions,
-        tools=bing.definitions,
-        headers={"x-ms-enable-preview": "true"}
-    )
+    async with _AGENT_POOL_LOCK:
+        if agent_name not in _AGENT_POOL:
+            _AGENT_POOL[agent_name] = await run_blocking(
+                project_client.agents.create_agent,
+                model=CONFIG.model_deployment_name,
+                name=agent_name,
+                instructions=instructions,
+                tools=bing.definitions,
+                headers={"x-ms-enable-preview": "true"}
+            )
+        return _AGENT_POOL[agent_name]
 
+@atexit.register
+def _delete_pooled_agents():
+    """
+    Delete all pooled agents when the process exits.
+    """
+    while _AGENT_POOL:
+        agent_name, agent = _AGENT_POOL.popitem()
+        try:
+            project_client.agents.delete_agent(agent.id)
+        except AzureError:
+            logger.exception("Failed to delete agent %s", agent_name)
+
+@contextlib.asynccontextmanager
+async def agent_session(agent_name: str, instructions: str):
+    """
+    Create a thread against the pooled agent for a tool, yielding (thread, agent).
+    The thread is deleted when the context exits.
+    """
+    agent = await get_pooled_agent(agent_name, instructions)
+    thread = await run_blocking(project_client.agents.create_thread)
     try:
-        # Create a thread and send the user query
-        thread = project_client.agents.create_thread()
-        project_client.agents.create_message(
-            thread_id=thread.id,
-            role="user",
-            content=f"{instructions} for {stock_name}."
-        )
+        yield thread, agent
+    finally:
+        await delete_thread(project_client.agents, thread.id)
+
+# Upper bound on tool calls running against Azure at the same time
+_TOOL_SEMAPHORE = asyncio.Semaphore(CONFIG.max_concurrent_tools)
+
+# Retry policy for failures the SDK cannot see. HTTP-level errors (408, 429, 5xx,
+# dropped connections) are already retried by azure-core's RetryPolicy, which also
+# honours Retry-After; retrying those here again would multiply the attempts.
+RETRY_ATTEMPTS = 5
+RETRY_MAX_WAIT = 30
+RETRYABLE_ERRORS = (TransientRunError, asyncio.TimeoutError)
+
+# Errors that count against the Bing circuit breaker
+BREAKER_ERRORS = (HttpResponseError, ServiceRequestError, ServiceResponseError) + RETRYABLE_ERRORS
+
+bing_breaker = CircuitBreaker(fail_max=5, reset_timeout=60)
+
+async def run_and_fetch(thread_id: str, agent_id: str):
+    await process_run(project_client.agents, thread_id, agent_id)
+    return await run_blocking(project_client.agents.list_messages, thread_id=thread_id)
+
+@retry_transient(RETRYABLE_ERRORS, attempts=RETRY_ATTEMPTS, max_wait=RETRY_MAX_WAIT)
+async def _execute_tool_once(stock_name: str, agent_name: str, instructions: str) -> str:
+    bing_breaker.check()
+    try:
+        # Hold a concurrency slot for this attempt only, not across retry backoff
+        async with _TOOL_SEMAPHORE, agent_session(agent_name, instructions) as (thread, agent):
+            # Send the user query
+            await run_blocking(
+                project_client.agents.create_message,
+                thread_id=thread.id,
+                role="user",
+                content=f"Stock: {stock_name}"
+            )
+
+            # Process the run and fetch messages, giving up after the configured timeout
+            messages = await asyncio.wait_for(run_and_fetch(thread.id, agent.id), timeout=CONFIG.tool_timeout_secs)
+    except BREAKER_ERRORS:
+        bing_breaker.record_failure()
+        raise
+    bing_breaker.record_success()
 
-        # Process the run and fetch messages
-        project_client.agents.create_and_process_run(thread_id=thread.id, agent_id=agent.id)
-        messages = project_client.agents.list_messages(thread_id=thread.id)
-        return messages["data"][0]["content"][0]["text"]["value"]
+    # Messages are newest first; anything but an assistant reply means the agent wrote nothing
+    latest = messages["data"][0]
+    if latest["role"] != "assistant":
+        raise RunFailedError(f"Run produced no assistant reply (latest message is from {latest['role']})")
+    return latest["content"][0]["text"]["value"]
+
+async def execute_tool(stock_name: str, agent_name: str, instructions: str) -> str:
+    """
+    Generic function to execute a tool using BingGroundingTool and Azure AI.
+    """
+    logger.info("[%s] Executing tool for %s...", agent_name, stock_name)
+    try:
+        return await _execute_tool_once(stock_name, agent_name, instructions)
 
-    except KeyError as e:
-        print(f"[Error] Missing key in response: {e}")
+    except (KeyError, IndexError):
+        logger.exception("[%s] Missing data in response", agent_name)
         return "Error: Unable to fetch data due to missing information."
-    except Exception as e:
-        print(f"[Error] Unexpected error: {e}")
-        return "Error: Unable to fetch data due to an unexpected issue."
-    finally:
-        # Clean up the agent
-        project_client.agents.delete_agent(agent.id)
+    except RunFailedError as e:
+        logger.error("[%s] %s", agent_name, e)
+        return "Error: Unable to fetch data because the agent run did not complete."
+    except CircuitOpenError as e:
+        logger.error("[%s] %s", agent_name, e)
+        return "Error: Unable to fetch data because the search service is unavailable."
+    except (HttpResponseError, ServiceRequestError, ServiceResponseError, asyncio.TimeoutError):
+        logger.exception("[%s] Azure request failed", agent_name)
+        return "Error: Unable to fetch data due to a service error."
+
+# Cached tool results, keyed by tool and stock name
+_CACHE = TTLCache(maxsize=1024)
+
+# Cache lifetimes in seconds, matched to how quickly each kind of data goes stale
+PRICE_CACHE_TTL = 5 * 60
+NEWS_CACHE_TTL = 15 * 60
+SENTIMENT_CACHE_TTL = 60 * 60
+
+def _cache_key(stock_name: str, tool_key: str) -> str:
+    return hashlib.sha256(f"{tool_key}|{stock_name.strip().lower()}".encode()).hexdigest()
+
+def cache_get(stock_name: str, tool_key: str):
+    """
+    Return the cached result for a tool and stock, or None if missing or expired.
+    """
+    return _CACHE.get(_cache_key(stock_name, tool_key))
+
+def cache_put(stock_name: str, tool_key: str, result: str, ttl: float):
+    """
+    Store a tool result for `ttl` seconds. Error results are never cached.
+    """
+    if not result.startswith("Error:"):
+        _CACHE.put(_cache_key(stock_name, tool_key), result, ttl)
 
 ###############################################################################
 #                               TOOL FUNCTIONS
 ###############################################################################
-async def stock_price_trends_tool(stock_name: str) -> str:
-    instructions = "Retrieve real-time stock prices, changes over the last few months, and summarize market trends"
-    return await execute_tool(stock_name, "stock_price_trends_tool_agent", instructions)
+@dataclass(frozen=True, slots=True)
+class ToolSpec:
+    """
+    One research tool: its function name prefix, its section heading in the
+    combined research answer, what it asks for, and how long its results are cached.
+    """
+    name: str
+    title: str
+    instructions: str
+    ttl: float
+
+    # Identifies this tool's entries in the result cache
+    @property
+    def cache_key(self) -> str:
+        return f"{self.name}_tool"
+
+TOOLS = [
+    ToolSpec(
+        name="stock_price_trends",
+        title="Price Trends",
+        instructions="Retrieve real-time stock prices, changes over the last few months, and summarize market trends",
+        ttl=PRICE_CACHE_TTL,
+    ),
+    ToolSpec(
+        name="news_analysis",
+        title="News",
+        instructions="Retrieve the latest news articles and summaries",
+        ttl=NEWS_CACHE_TTL,
+    ),
+    ToolSpec(
+        name="market_sentiment",
+        title="Market Sentiment",
+        instructions="Analyze general market sentiment and user opinions",
+        ttl=SENTIMENT_CACHE_TTL,
+    ),
+    ToolSpec(
+        name="analyst_reports",
+        title="Analyst Reports",
+        instructions="Find recent analyst reports, price targets, or professional opinions",
+        ttl=SENTIMENT_CACHE_TTL,
+    ),
+    ToolSpec(
+        name="expert_opinions",
+        title="Expert Opinions",
+        instructions="Collect expert opinions or quotes from industry leaders",
+        ttl=SENTIMENT_CACHE_TTL,
+    ),
+]
+TOOLS_BY_NAME = {spec.name: spec for spec in TOOLS}
+
+COMBINED_RESEARCH_AGENT = "combined_research_tool_agent"
+COMBINED_RESEARCH_INSTRUCTIONS = (
+    "\n".join(f"## {spec.title}\n{spec.instructions}." for spec in TOOLS)
+    + "\n\nWrite each of the sections above under its markdown heading, exactly as written, "
+    "with the research for the stock named in the user message."
+)
 
-async def news_analysis_tool(stock_name: str) -> str:
-    instructions = "Retrieve the latest news articles and summaries"
-    return await execute_tool(stock_name, "news_analysis_tool_agent", instructions)
+# Combined research calls in progress, keyed by normalized stock name
+_RESEARCH_IN_FLIGHT: dict[str, asyncio.Task] = {}
 
-async def market_sentiment_tool(stock_name: str) -> str:
-    instructions = "Analyze general market sentiment and user opinions"
-    return await execute_tool(stock_name, "market_sentiment_tool_agent", instructions)
+def parse_research_sections(text: str) -> dict[str, str]:
+    """
+    Split the combined research answer into its sections, keyed by title. If any
+    section has no heading, every section gets the full answer instead, so the
+    grounded research is never thrown away over formatting; callers that combine
+    sections use collapse_repeated to include it only once.
+    """
+    sections = parse_sections(text, [spec.title for spec in TOOLS])
+    missing = [spec.title for spec in TOOLS if spec.title not in sections]
+    if missing:
+        logger.warning("Sections %s not found in research answer; using the full answer", missing)
+        return {spec.title: text for spec in TOOLS}
+    return sections
 
-async def analyst_reports_tool(stock_name: str) -> str:
-    instructions = "Find recent analyst reports, price targets, or professional opinions"
-    return await execute_tool(stock_name, "analyst_reports_tool_agent", instructions)
+async def combined_research_tool(stock_name: str) -> dict[str, str]:
+    """
+    Fetch all five research sections for a stock in a single agent run.
+    Concurrent calls for the same stock share one run.
+    """
+    key = stock_name.strip().lower()
+    task = _RESEARCH_IN_FLIGHT.get(key)
+    if task is None:
+        task = asyncio.ensure_future(execute_tool(stock_name, COMBINED_RESEARCH_AGENT, COMBINED_RESEARCH_INSTRUCTIONS))
+        _RESEARCH_IN_FLIGHT[key] = task
+        task.add_done_callback(lambda _: _RESEARCH_IN_FLIGHT.pop(key, None))
+    text = await asyncio.shield(task)
+    if text.startswith("Error:"):
+        return {spec.title: text for spec in TOOLS}
 
-async def expert_opinions_tool(stock_name: str) -> str:
-    instructions = "Collect expert opinions or quotes from industry leaders"
-    return await execute_tool(stock_name, "expert_opinions_tool_agent", instructions)
+    sections = parse_research_sections(text)
+    for spec in TOOLS:
+        cache_put(stock_name, spec.cache_key, sections[spec.title], spec.ttl)
+    return sections
+
+async def research_section(stock_name: str, spec: ToolSpec) -> str:
+    """
+    Return one research section for a stock, from the cache or a combined research run.
+    """
+    cached = cache_get(stock_name, spec.cache_key)
+    if cached is not None:
+        return cached
+    sections = await combined_research_tool(stock_name)
+    return sections[spec.title]
+
+async def fanout_all_tools(stock_name: str) -> dict:
+    """
+    Run all five tools concurrently and return their results keyed by section title.
+    Text shared by several sections is returned once, under "Research".
+    """
+    results = await asyncio.gather(
+        *(research_section(stock_name, spec) for spec in TOOLS),
+        return_exceptions=True
+    )
+    return collapse_repeated({spec.title: _as_text(result) for spec, result in zip(TOOLS, results)})
+
+def _as_text(result) -> str:
+    """
+    Turn a gather() result into text, mapping exceptions onto the "Error:" sentinel.
+    """
+    if isinstance(result, BaseException):
+        logger.error("Tool failed", exc_info=result)
+        return f"Error: Unable to fetch data ({result})."
+    return result
 
 ###############################################################################
 #                               AGENT FUNCTIONS
 ###############################################################################
-async def stock_price_trends_agent(stock_name: str) -> str:
-    return await stock_price_trends_tool(stock_name)
+def _make_research_agent(spec: ToolSpec):
+    """
+    Build the tool function an assistant calls to get one research section.
+    """
+    async def research(stock_name: str) -> str:
+        return await research_section(stock_name, spec)
 
-async def news_analysis_agent(stock_name: str) -> str:
-    return await news_analysis_tool(stock_name)
+    research.__name__ = research.__qualname__ = f"{spec.name}_agent"
+    research.__doc__ = f"{spec.instructions} for the given stock."
+    return research
 
-async def market_sentiment_agent(stock_name: str) -> str:
-    return await market_sentiment_tool(stock_name)
+stock_price_trends_agent = _make_research_agent(TOOLS_BY_NAME["stock_price_trends"])
+news_analysis_agent = _make_research_agent(TOOLS_BY_NAME["news_analysis"])
+
+async def gather_sentiment(stock_name: str) -> str:
+    """
+    Run the market sentiment, analyst reports and expert opinions tools concurrently.
+    """
+    specs = [TOOLS_BY_NAME[name] for name in ("market_sentiment", "analyst_reports", "expert_opinions")]
+    results = await asyncio.gather(
+        *(research_section(stock_name, spec) for spec in specs),
+        return_exceptions=True
+    )
+    sections = collapse_repeated({spec.title: _as_text(result) for spec, result in zip(specs, results)})
+    return "\n\n".join(f"## {title}\n{text}" for title, text in sections.items())
+
+###############################################################################
+#                               CACHE WARMING
+###############################################################################
+# Refresh at half the shortest TTL so watched tickers never expire between refreshes
+WARM_INTERVAL = min(spec.ttl for spec in TOOLS) / 2
 
-async def analyst_reports_agent(stock_name: str) -> str:
-    return await analyst_reports_tool(stock_name)
+async def warm_cache(tickers: list[str]):
+    """
+    Fetch fresh research for every ticker concurrently, refreshing all cached sections.
+    """
+    results = await asyncio.gather(
+        *(combined_research_tool(ticker) for ticker in tickers),
+        return_exceptions=True
+    )
+    for ticker, result in zip(tickers, results):
+        if isinstance(result, BaseException):
+            logger.error("Failed to warm cache for %s", ticker, exc_info=result)
 
-async def expert_opinions_agent(stock_name: str) -> str:
-    return await expert_opinions_tool(stock_name)
+async def periodic_warm(tickers: list[str]):
+    """
+    Warm the cache for the watchlist now and then every WARM_INTERVAL seconds.
+    """
+    while True:
+        logger.info("Warming cache for %d watchlist ticker(s)...", len(tickers))
+        await warm_cache(tickers)
+        await asyncio.sleep(WARM_INTERVAL)
 
 ###############################################################################
 #                               ASSISTANT AGENTS
@@ -159,11 +414,7 @@ news_agent_assistant = AssistantAgent(
 sentiment_agent_assistant = AssistantAgent(
     name="sentiment_agent",
     model_client=az_model_client,
-    tools=[
-        market_sentiment_agent,
-        analyst_reports_agent,
-        expert_opinions_agent
-    ],
+    tools=[gather_sentiment],
     system_message=(
         "You are the Market Sentiment Agent. "
         "You gather overall market sentiment, relevant analyst reports, and expert opinions. "
@@ -203,15 +454,35 @@ investment_team = RoundRobinGroupChat(
 #                                   MAIN
 ###############################################################################
 async def main():
+    warm_task = None
     try:
         stock_name = "tata motors"
+
+        # Start the user's research before warming so it is first in line for
+        # concurrency slots; a watched ticker matching it joins the same run
+        research_task = asyncio.create_task(fanout_all_tools(stock_name))
+        if CONFIG.watchlist:
+            warm_task = asyncio.create_task(periodic_warm(list(CONFIG.watchlist)))
+        research = await research_task
+        research_text = "\n\n".join(f"## {title}\n{text}" for title, text in research.items())
         await Console(
             investment_team.run_stream(
-                task=f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest."
+                task=(
+                    f"Analyze stock trends, news, and sentiment for {stock_name}, plus analyst reports and expert opinions, and then decide whether to invest.\n\n"
+                    "The research below has already been gathered; use it instead of calling your tools again.\n\n"
+                    f"{research_text}"
+                )
             )
         )
-    except Exception as e:
-        print(f"Error in main: {e}")
+    except Exception:
+        logger.exception("Error in main")
+    finally:
+        if warm_task is not None:
+            warm_task.cancel()
 
 if __name__ == "__main__":
+    # Root stays at WARNING so azure-core, httpx and autogen don't log every request;
+    # only this app's own messages are shown at INFO
+    logging.basicConfig(level=logging.WARNING, format="%(asctime)s [%(levelname)s] %(message)s")
+    logger.setLevel(logging.INFO)
     asyncio.run(main())
\ No newline at end of file
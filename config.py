@@ -0,0 +1,57 @@
+import math
+import os
+from dataclasses import dataclass
+
+@dataclass(frozen=True, slots=True)
+class AppConfig:
+    """
+    Settings read from the environment (or .env) once at startup.
+    """
+    api_key: str
+    project_connection_string: str
+    bing_connection_name: str
+    model_deployment_name: str
+    model_api_version: str
+    azure_endpoint: str
+    max_concurrent_tools: int = 4
+    tool_timeout_secs: float = 45
+    watchlist: tuple[str, ...] = ()
+
+    @classmethod
+    def from_env(cls) -> "AppConfig":
+        # Required settings, keyed by environment variable name
+        required = {
+            "api_key": "api_key",
+            "project_connection_string": "PROJECT_CONNECTION_STRING",
+            "bing_connection_name": "BING_CONNECTION_NAME",
+            "model_deployment_name": "MODEL_DEPLOYMENT_NAME",
+            "model_api_version": "MODEL_API_VERSION",
+            "azure_endpoint": "AZURE_ENDPOINT",
+        }
+        values = {field: os.getenv(env_var) for field, env_var in required.items()}
+        errors = [f"{env_var} is not set" for field, env_var in required.items() if not values[field]]
+
+        # Optional settings, with the kind of value each must hold
+        for field, env_var, convert, kind in [
+            ("max_concurrent_tools", "MAX_CONCURRENT_TOOLS", int, "integer"),
+            ("tool_timeout_secs", "TOOL_TIMEOUT_SECS", float, "number"),
+        ]:
+            raw = os.getenv(env_var)
+            if not raw:
+                continue
+            try:
+                value = convert(raw)
+            except ValueError:
+                errors.append(f"{env_var} must be a positive {kind}, got {raw!r}")
+                continue
+            if not math.isfinite(value) or value <= 0:
+                errors.append(f"{env_var} must be a positive {kind}, got {raw!r}")
+                continue
+            values[field] = value
+        values["watchlist"] = tuple(
+            ticker.strip() for ticker in os.getenv("WATCHLIST", "").split(",") if ticker.strip()
+        )
+
+        if errors:
+            raise ValueError("Invalid environment configuration: " + "; ".join(errors) + ".")
+        return cls(**values)
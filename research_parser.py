@@ -0,0 +1,69 @@
+import re
+from collections import Counter
+
+# A markdown heading ("## Price Trends", "### 1. News ###"), a line that is entirely
+# bold ("**News**", "1. **Expert Opinions:**"), or a bold label followed by the section
+# text on the same line ("**Price Trends:** Up 5%", "- **News**: Tata launched ...")
+_HEADING_LINE = re.compile(
+    r"^[ \t]*(?:(?P<hashes>#{1,6})[ \t]*(?P<markdown>.+?)[ \t#]*"
+    r"|(?:\d+[.)][ \t]*)?\*\*(?P<bold>[^*\n]+)\*\*[ \t]*:?"
+    r"|(?:[-*+][ \t]+)?(?:\d+[.)][ \t]*)?\*\*(?P<inline>[^*\n]+?)(?::\*\*|\*\*[ \t]*:)[ \t]*(?P<rest>\S.*?))[ \t]*$",
+    flags=re.MULTILINE
+)
+
+# Heading level given to bold headings and labels, below every markdown level
+_BOLD_LEVEL = 7
+
+# Leading numbering and emphasis in front of the heading text, e.g. "1. " or "**"
+_HEADING_PREFIX = re.compile(r"^(?:\*\*|__)?[ \t]*(?:\d+[.)][ \t]*)?(?:\*\*|__)?[ \t]*")
+
+def parse_sections(text: str, titles: list[str]) -> dict[str, str]:
+    """
+    Split a markdown answer into sections whose headings start with one of `titles`,
+    keyed by title. Headings may be numbered, bold, inline bold labels
+    ("**News:** ..."), or carry extra words after the title
+    ("## 1. Price Trends for Tata Motors"). Only headings at the level of the
+    first matching heading start a section, so a sub-heading such as
+    "### News impact on price" stays inside the section it appears in, as do all
+    other headings. Titles with no heading or an empty body are left out.
+    """
+    title_pattern = re.compile(
+        r"(" + "|".join(re.escape(title) for title in titles) + r")\b",
+        flags=re.IGNORECASE
+    )
+    canonical = {title.lower(): title for title in titles}
+
+    # (title, start of heading line, start of section text) for every section heading
+    headings = []
+    section_level = None
+    for match in _HEADING_LINE.finditer(text):
+        heading = _HEADING_PREFIX.sub("", match.group("markdown") or match.group("bold") or match.group("inline"))
+        title_match = title_pattern.match(heading)
+        if not title_match:
+            continue
+        level = len(match.group("hashes")) if match.group("hashes") else _BOLD_LEVEL
+        if section_level is None:
+            section_level = level
+        if level == section_level:
+            body_start = match.start("rest") if match.group("rest") else match.end()
+            headings.append((canonical[title_match.group(1).lower()], match.start(), body_start))
+
+    sections = {}
+    for index, (title, _, body_start) in enumerate(headings):
+        body_end = headings[index + 1][1] if index + 1 < len(headings) else len(text)
+        body = text[body_start:body_end].strip()
+        if body and title not in sections:
+            sections[title] = body
+    return sections
+
+def collapse_repeated(sections: dict[str, str], label: str = "Research") -> dict[str, str]:
+    """
+    Return `sections` with any text shared by several entries (an answer that could
+    not be split, or one error reported for every section) kept only once, under `label`.
+    """
+    counts = Counter(sections.values())
+    collapsed = {title: text for title, text in sections.items() if counts[text] == 1}
+    shared = [text for text, count in counts.items() if count > 1]
+    if shared:
+        collapsed[label] = "\n\n".join(shared)
+    return collapsed
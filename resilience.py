@@ -0,0 +1,58 @@
+import time
+import random
+import asyncio
+import logging
+import functools
+
+logger = logging.getLogger(__name__)
+
+def retry_transient(retryable: tuple, attempts: int = 5, max_wait: float = 30):
+    """
+    Retry an async function on `retryable` errors with exponential backoff
+    (1 s, 2 s, 4 s, ... capped at `max_wait`, plus up to 1 s of jitter).
+    The last error is re-raised once `attempts` calls have failed.
+    """
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            for attempt in range(1, attempts + 1):
+                try:
+                    return await func(*args, **kwargs)
+                except retryable as e:
+                    if attempt == attempts:
+                        raise
+                    delay = min(max_wait, 2 ** (attempt - 1)) + random.random()
+                    logger.warning(
+                        "%s failed (%r), attempt %d/%d; retrying in %.1fs",
+                        func.__name__, e, attempt, attempts, delay
+                    )
+                    await asyncio.sleep(delay)
+        return wrapper
+    return decorator
+
+class CircuitOpenError(Exception):
+    pass
+
+class CircuitBreaker:
+    """
+    Stop calling a failing service for `reset_timeout` seconds after `fail_max` consecutive failures.
+    """
+    def __init__(self, fail_max: int, reset_timeout: float, timer=time.monotonic):
+        self.fail_max = fail_max
+        self.reset_timeout = reset_timeout
+        self._timer = timer
+        self._failures = 0
+        self._opened_at = None
+
+    def check(self):
+        if self._opened_at is not None and self._timer() - self._opened_at < self.reset_timeout:
+            raise CircuitOpenError("Bing grounding calls are paused after repeated failures.")
+
+    def record_success(self):
+        self._failures = 0
+        self._opened_at = None
+
+    def record_failure(self):
+        self._failures += 1
+        if self._failures >= self.fail_max:
+            self._opened_at = self._timer()
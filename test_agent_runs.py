@@ -0,0 +1,118 @@
+import time
+import asyncio
+import threading
+from types import SimpleNamespace
+
+import pytest
+
+import agent_runs
+from azure.core.exceptions import HttpResponseError, ServiceRequestError
+
+from agent_runs import RunFailedError, TransientRunError, delete_thread, process_run
+
+@pytest.fixture(autouse=True)
+def fast_polling(monkeypatch):
+    monkeypatch.setattr(agent_runs, "RUN_POLL_INITIAL_INTERVAL", 0.01)
+    monkeypatch.setattr(agent_runs, "RUN_POLL_MAX_INTERVAL", 0.01)
+
+class FakeAgents:
+    """
+    Stands in for AIProjectClient.agents: each get_run returns the next status in `statuses`.
+    """
+    def __init__(self, statuses, last_error=None, create_delay=0.0):
+        self.statuses = list(statuses)
+        self.last_error = last_error
+        self.create_delay = create_delay
+        self.created = threading.Event()
+        self.cancelled = []
+
+    def _run(self, status):
+        return SimpleNamespace(id="run_1", status=status, last_error=self.last_error)
+
+    def create_run(self, thread_id, agent_id):
+        time.sleep(self.create_delay)
+        self.created.set()
+        return self._run(self.statuses.pop(0))
+
+    def get_run(self, thread_id, run_id):
+        status = self.statuses.pop(0)
+        if isinstance(status, Exception):
+            raise status
+        return self._run(status)
+
+    def cancel_run(self, thread_id, run_id):
+        self.cancelled.append(run_id)
+
+    def delete_thread(self, thread_id):
+        raise HttpResponseError("thread not found")
+
+def test_polls_until_completed():
+    agents = FakeAgents(["queued", "in_progress", "completed"])
+    run = asyncio.run(process_run(agents, "thread_1", "agent_1"))
+    assert run.status == "completed"
+    assert agents.cancelled == []
+
+def test_poll_interval_backs_off_to_max(monkeypatch):
+    monkeypatch.setattr(agent_runs, "RUN_POLL_INITIAL_INTERVAL", 0.25)
+    monkeypatch.setattr(agent_runs, "RUN_POLL_MAX_INTERVAL", 1.0)
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(agent_runs.asyncio, "sleep", fake_sleep)
+    asyncio.run(process_run(FakeAgents(["queued"] * 5 + ["completed"]), "thread_1", "agent_1"))
+    assert delays == [0.25, 0.5, 1.0, 1.0, 1.0]
+
+def test_failed_run_raises():
+    agents = FakeAgents(["in_progress", "failed"], last_error=SimpleNamespace(code="invalid_prompt"))
+    with pytest.raises(RunFailedError) as excinfo:
+        asyncio.run(process_run(agents, "thread_1", "agent_1"))
+    assert not isinstance(excinfo.value, TransientRunError)
+    assert excinfo.value.code == "invalid_prompt"
+
+@pytest.mark.parametrize("code", ["rate_limit_exceeded", "server_error"])
+def test_rate_limited_run_raises_transient_error(code):
+    agents = FakeAgents(["failed"], last_error=SimpleNamespace(code=code))
+    with pytest.raises(TransientRunError):
+        asyncio.run(process_run(agents, "thread_1", "agent_1"))
+
+@pytest.mark.parametrize("status", ["cancelled", "expired", "requires_action"])
+def test_other_final_statuses_raise(status):
+    with pytest.raises(RunFailedError):
+        asyncio.run(process_run(FakeAgents([status]), "thread_1", "agent_1"))
+
+def test_timeout_while_polling_cancels_run():
+    agents = FakeAgents(["in_progress"] * 1000)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(process_run(agents, "thread_1", "agent_1"), timeout=0.05))
+    assert agents.cancelled == ["run_1"]
+
+def test_failed_status_check_cancels_run():
+    agents = FakeAgents(["in_progress", ServiceRequestError("connection reset")])
+    with pytest.raises(ServiceRequestError):
+        asyncio.run(process_run(agents, "thread_1", "agent_1"))
+    assert agents.cancelled == ["run_1"]
+
+def test_create_run_failure_cancels_nothing():
+    class FailingAgents(FakeAgents):
+        def create_run(self, thread_id, agent_id):
+            raise HttpResponseError("bad request")
+
+    agents = FailingAgents([])
+    with pytest.raises(HttpResponseError):
+        asyncio.run(process_run(agents, "thread_1", "agent_1"))
+    assert agents.cancelled == []
+
+def test_timeout_before_create_run_returns_still_cancels_run():
+    agents = FakeAgents(["in_progress"], create_delay=0.2)
+    with pytest.raises(asyncio.TimeoutError):
+        asyncio.run(asyncio.wait_for(process_run(agents, "thread_1", "agent_1"), timeout=0.05))
+    assert agents.created.is_set()
+    assert agents.cancelled == ["run_1"]
+
+def test_delete_thread_failure_is_logged_not_raised(caplog):
+    asyncio.run(delete_thread(FakeAgents([]), "thread_1"))
+    assert "Failed to delete thread thread_1" in caplog.text
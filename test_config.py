@@ -0,0 +1,63 @@
+import pytest
+
+from config import AppConfig
+
+REQUIRED = {
+    "api_key": "key",
+    "PROJECT_CONNECTION_STRING": "conn",
+    "BING_CONNECTION_NAME": "bing",
+    "MODEL_DEPLOYMENT_NAME": "gpt-4o",
+    "MODEL_API_VERSION": "2025-01-01-preview",
+    "AZURE_ENDPOINT": "https://example.openai.azure.com",
+}
+
+@pytest.fixture
+def env(monkeypatch):
+    for name in ["MAX_CONCURRENT_TOOLS", "TOOL_TIMEOUT_SECS", "WATCHLIST"]:
+        monkeypatch.delenv(name, raising=False)
+    for name, value in REQUIRED.items():
+        monkeypatch.setenv(name, value)
+    return monkeypatch
+
+def test_defaults(env):
+    config = AppConfig.from_env()
+    assert config.model_deployment_name == "gpt-4o"
+    assert config.max_concurrent_tools == 4
+    assert config.tool_timeout_secs == 45
+    assert config.watchlist == ()
+
+def test_optional_settings(env):
+    env.setenv("MAX_CONCURRENT_TOOLS", "8")
+    env.setenv("TOOL_TIMEOUT_SECS", "12.5")
+    env.setenv("WATCHLIST", " tata motors, infosys ,,")
+    config = AppConfig.from_env()
+    assert config.max_concurrent_tools == 8
+    assert config.tool_timeout_secs == 12.5
+    assert config.watchlist == ("tata motors", "infosys")
+
+def test_reports_every_missing_variable(env):
+    env.delenv("api_key")
+    env.delenv("AZURE_ENDPOINT")
+    with pytest.raises(ValueError) as excinfo:
+        AppConfig.from_env()
+    assert "api_key is not set" in str(excinfo.value)
+    assert "AZURE_ENDPOINT is not set" in str(excinfo.value)
+
+@pytest.mark.parametrize("name, value, expected", [
+    ("MAX_CONCURRENT_TOOLS", "four", "MAX_CONCURRENT_TOOLS must be a positive integer, got 'four'"),
+    ("MAX_CONCURRENT_TOOLS", "4.5", "MAX_CONCURRENT_TOOLS must be a positive integer, got '4.5'"),
+    ("MAX_CONCURRENT_TOOLS", "0", "MAX_CONCURRENT_TOOLS must be a positive integer, got '0'"),
+    ("TOOL_TIMEOUT_SECS", "-1", "TOOL_TIMEOUT_SECS must be a positive number, got '-1'"),
+    ("TOOL_TIMEOUT_SECS", "nan", "TOOL_TIMEOUT_SECS must be a positive number, got 'nan'"),
+    ("TOOL_TIMEOUT_SECS", "inf", "TOOL_TIMEOUT_SECS must be a positive number, got 'inf'"),
+])
+def test_rejects_invalid_numbers(env, name, value, expected):
+    env.setenv(name, value)
+    with pytest.raises(ValueError) as excinfo:
+        AppConfig.from_env()
+    assert expected in str(excinfo.value)
+
+def test_is_frozen(env):
+    config = AppConfig.from_env()
+    with pytest.raises(AttributeError):
+        config.api_key = "other"
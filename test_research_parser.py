@@ -0,0 +1,85 @@
+from research_parser import collapse_repeated, parse_sections
+
+TITLES = ["Price Trends", "News", "Market Sentiment", "Analyst Reports", "Expert Opinions"]
+
+def test_plain_markdown_headings():
+    text = "Intro\n## Price Trends\nUp 5%.\n\n## News\nNew EV launch.\n"
+    assert parse_sections(text, TITLES) == {"Price Trends": "Up 5%.", "News": "New EV launch."}
+
+def test_numbered_and_suffixed_headings():
+    text = (
+        "## 1. Price Trends for Tata Motors\nUp 5%.\n"
+        "## 2) News ##\nNew EV launch.\n"
+        "## Market Sentiment:\nPositive.\n"
+    )
+    assert parse_sections(text, TITLES) == {
+        "Price Trends": "Up 5%.",
+        "News": "New EV launch.",
+        "Market Sentiment": "Positive.",
+    }
+
+def test_bold_headings():
+    text = "**News**\nNew EV launch.\n1. **Analyst Reports:**\nBuy, target 1200.\n**Expert Opinions**\nBullish."
+    assert parse_sections(text, TITLES) == {
+        "News": "New EV launch.",
+        "Analyst Reports": "Buy, target 1200.",
+        "Expert Opinions": "Bullish.",
+    }
+
+def test_bold_text_inside_markdown_heading():
+    assert parse_sections("## **Expert Opinions**\nBullish.", TITLES) == {"Expert Opinions": "Bullish."}
+
+def test_sub_heading_starting_with_a_title_stays_in_its_section():
+    text = (
+        "## Price Trends\nUp 5%.\n"
+        "### News impact on price\nShares jumped after launch.\n"
+        "## News\nTata launched a new EV.\n"
+        "## Market Sentiment\nPositive."
+    )
+    assert parse_sections(text, TITLES) == {
+        "Price Trends": "Up 5%.\n### News impact on price\nShares jumped after launch.",
+        "News": "Tata launched a new EV.",
+        "Market Sentiment": "Positive.",
+    }
+
+def test_headings_match_case_insensitively_and_use_canonical_titles():
+    assert parse_sections("## PRICE TRENDS\nUp.", TITLES) == {"Price Trends": "Up."}
+
+def test_other_headings_and_body_lines_stay_in_section():
+    text = "## News\n### Key headlines\nNews coverage was strong.\n**Newsworthy** items too.\n## Price Trends\nUp."
+    assert parse_sections(text, TITLES) == {
+        "News": "### Key headlines\nNews coverage was strong.\n**Newsworthy** items too.",
+        "Price Trends": "Up.",
+    }
+
+def test_no_matching_headings():
+    assert parse_sections("Tata Motors rose 5% this week.", TITLES) == {}
+
+def test_empty_sections_are_left_out():
+    assert parse_sections("## News\n\n## Price Trends\nUp.", TITLES) == {"Price Trends": "Up."}
+
+def test_inline_bold_labels():
+    text = (
+        "**Price Trends:** Up 5% this quarter.\n"
+        "- **News**: Tata launched a new EV.\nSales rose too.\n"
+        "1. **Market Sentiment:** Positive."
+    )
+    assert parse_sections(text, TITLES) == {
+        "Price Trends": "Up 5% this quarter.",
+        "News": "Tata launched a new EV.\nSales rose too.",
+        "Market Sentiment": "Positive.",
+    }
+
+def test_bold_words_inside_a_sentence_are_not_labels():
+    text = "**News**\n**Tata Motors** shares rose.\n**Price Trends** were up, analysts said."
+    assert parse_sections(text, TITLES) == {
+        "News": "**Tata Motors** shares rose.\n**Price Trends** were up, analysts said.",
+    }
+
+def test_collapse_repeated_keeps_shared_text_once():
+    sections = {"Price Trends": "full answer", "News": "full answer", "Market Sentiment": "Positive."}
+    assert collapse_repeated(sections) == {"Market Sentiment": "Positive.", "Research": "full answer"}
+
+def test_collapse_repeated_leaves_distinct_sections_alone():
+    sections = {"Price Trends": "Up.", "News": "EV launch."}
+    assert collapse_repeated(sections) == sections
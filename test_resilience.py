@@ -0,0 +1,97 @@
+import asyncio
+
+import pytest
+
+import resilience
+from resilience import CircuitBreaker, CircuitOpenError, retry_transient
+
+class Flaky(Exception):
+    pass
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """
+    Record backoff delays instead of sleeping.
+    """
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(resilience.asyncio, "sleep", fake_sleep)
+    monkeypatch.setattr(resilience.random, "random", lambda: 0.5)
+    return delays
+
+def failing(times: int, error=Flaky):
+    calls = []
+
+    async def func():
+        calls.append(1)
+        if len(calls) <= times:
+            raise error("boom")
+        return "ok"
+
+    return func, calls
+
+def test_retry_succeeds_after_backoff(sleeps):
+    func, calls = failing(2)
+    assert asyncio.run(retry_transient((Flaky,), attempts=5)(func)()) == "ok"
+    assert len(calls) == 3
+    assert sleeps == [1.5, 2.5]
+
+def test_retry_backoff_is_capped(sleeps):
+    func, _ = failing(4)
+    asyncio.run(retry_transient((Flaky,), attempts=5, max_wait=3)(func)())
+    assert sleeps == [1.5, 2.5, 3.5, 3.5]
+
+def test_retry_gives_up_after_last_attempt(sleeps):
+    func, calls = failing(10)
+    with pytest.raises(Flaky):
+        asyncio.run(retry_transient((Flaky,), attempts=3)(func)())
+    assert len(calls) == 3
+    assert len(sleeps) == 2
+
+def test_retry_ignores_other_errors(sleeps):
+    func, calls = failing(1, error=ValueError)
+    with pytest.raises(ValueError):
+        asyncio.run(retry_transient((Flaky,))(func)())
+    assert len(calls) == 1
+    assert sleeps == []
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_breaker_opens_after_consecutive_failures():
+    breaker = CircuitBreaker(fail_max=3, reset_timeout=60, timer=Clock())
+    for _ in range(2):
+        breaker.record_failure()
+        breaker.check()
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+
+def test_breaker_success_resets_failure_count():
+    breaker = CircuitBreaker(fail_max=2, reset_timeout=60, timer=Clock())
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    breaker.check()
+
+def test_breaker_allows_calls_again_after_reset_timeout():
+    clock = Clock()
+    breaker = CircuitBreaker(fail_max=1, reset_timeout=60, timer=clock)
+    breaker.record_failure()
+    clock.now += 59
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
+    clock.now += 1
+    breaker.check()
+
+    # A failure on the trial call opens the circuit again straight away
+    breaker.record_failure()
+    with pytest.raises(CircuitOpenError):
+        breaker.check()
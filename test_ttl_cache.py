@@ -0,0 +1,66 @@
+from ttl_cache import TTLCache
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+def test_get_returns_value_until_ttl_expires():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, timer=clock)
+    cache.put("a", "value", ttl=60)
+    clock.now += 59
+    assert cache.get("a") == "value"
+    clock.now += 1
+    assert cache.get("a") is None
+
+def test_missing_key():
+    assert TTLCache(maxsize=10).get("missing") is None
+
+def test_entries_keep_their_own_ttl():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, timer=clock)
+    cache.put("short", 1, ttl=10)
+    cache.put("long", 2, ttl=100)
+    clock.now += 50
+    assert cache.get("short") is None
+    assert cache.get("long") == 2
+
+def test_put_replaces_value_and_ttl():
+    clock = Clock()
+    cache = TTLCache(maxsize=10, timer=clock)
+    cache.put("a", "old", ttl=10)
+    cache.put("a", "new", ttl=100)
+    clock.now += 50
+    assert cache.get("a") == "new"
+    assert len(cache) == 1
+
+def test_full_cache_drops_expired_entries_first():
+    clock = Clock()
+    cache = TTLCache(maxsize=2, timer=clock)
+    cache.put("old", 1, ttl=100)
+    cache.put("expiring", 2, ttl=10)
+    clock.now += 20
+    cache.put("new", 3, ttl=100)
+    assert cache.get("old") == 1
+    assert cache.get("new") == 3
+    assert len(cache) == 2
+
+def test_full_cache_evicts_oldest_entry():
+    cache = TTLCache(maxsize=2, timer=Clock())
+    cache.put("first", 1, ttl=100)
+    cache.put("second", 2, ttl=100)
+    cache.put("third", 3, ttl=100)
+    assert cache.get("first") is None
+    assert cache.get("second") == 2
+    assert cache.get("third") == 3
+
+def test_updating_a_key_in_a_full_cache_evicts_nothing():
+    cache = TTLCache(maxsize=2, timer=Clock())
+    cache.put("first", 1, ttl=100)
+    cache.put("second", 2, ttl=100)
+    cache.put("first", 10, ttl=100)
+    assert cache.get("first") == 10
+    assert cache.get("second") == 2
@@ -0,0 +1,38 @@
+import time
+
+class TTLCache:
+    """
+    A small in-process cache where every entry carries its own lifetime.
+    When full, expired entries are dropped first, then the oldest entry.
+    """
+    def __init__(self, maxsize: int, timer=time.monotonic):
+        self.maxsize = maxsize
+        self._timer = timer
+        # key -> (expires_at, value), in insertion order
+        self._entries: dict = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """
+        Return the value for `key`, or None if it is missing or expired.
+        """
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] > self._timer():
+            return entry[1]
+        return None
+
+    def put(self, key, value, ttl: float):
+        """
+        Store `value` under `key` for `ttl` seconds.
+        """
+        now = self._timer()
+        if key not in self._entries and len(self._entries) >= self.maxsize:
+            for expired in [k for k, (expires_at, _) in self._entries.items() if expires_at <= now]:
+                del self._entries[expired]
+            if len(self._entries) >= self.maxsize:
+                # Evict the oldest entry
+                del self._entries[next(iter(self._entries))]
+        self._entries.pop(key, None)
+        self._entries[key] = (now + ttl, value)